@@ -7,7 +7,9 @@ from __future__ import annotations
 
 import copy
 import csv
+import functools
 import glob
+import json
 import os
 import re
 import yaml
@@ -16,6 +18,73 @@ from typing import Any, Optional, Union
 
 from .transaction import Transaction, Transactions
 
+# The libyaml-backed loader is much faster than the pure-Python one, but is only
+# available when PyYAML was built against libyaml.
+_YAML_LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+# The maximum number of descriptions whose categorization results are memoized
+# by `Categorizer._match()`.
+_MATCH_CACHE_SIZE = 4096
+
+def _required_literal(pattern: str) -> str:
+    '''
+    Returns the longest run of literal characters that every string matched by
+    the specified regular expression must contain, or an empty string if no
+    such run can be safely determined. Patterns containing alternations or
+    inline flags are never reduced to a literal, and the contents of groups
+    and character sets are ignored.
+    '''
+    if '|' in pattern or '(?' in pattern: return ''
+    runs = ['']
+    depth = 0
+    i = 0
+    while i < len(pattern):
+        c = pattern[i]
+        if c == '\\' and i + 1 < len(pattern) and not pattern[i + 1].isalnum():
+            if depth == 0: runs[-1] += pattern[i + 1]
+            i += 2
+            continue
+        if c == '\\':
+            # Escapes such as `\d` or `\b` match no fixed text, while numeric
+            # escapes (`\x26`, `\u0062`, `\N{...}`, `\0`, `\12`) span more than
+            # two characters, all of which must be skipped.
+            e = pattern[i + 1:i + 2]
+            i += 2
+            if e == 'x':
+                i += 2
+            elif e == 'u':
+                i += 4
+            elif e == 'U':
+                i += 8
+            elif e == 'N' and pattern[i:i + 1] == '{':
+                while i < len(pattern) and pattern[i] != '}': i += 1
+                i += 1
+            elif e.isdigit():
+                while i < len(pattern) and pattern[i].isdigit(): i += 1
+        elif c == '[':
+            i += 1
+            if pattern[i:i + 1] == '^': i += 1
+            if pattern[i:i + 1] == ']': i += 1
+            while i < len(pattern) and pattern[i] != ']':
+                if pattern[i] == '\\': i += 1
+                i += 1
+            i += 1
+        elif c in '*?{':
+            runs[-1] = runs[-1][:-1]
+            if c == '{':
+                while i < len(pattern) and pattern[i] != '}': i += 1
+            i += 1
+        elif c in '()+.^$':
+            if c == '(': depth += 1
+            if c == ')': depth -= 1
+            i += 1
+        else:
+            if depth == 0: runs[-1] += c
+            i += 1
+            continue
+        runs.append('')
+    return max(runs, key=len)
+
 class Categorizer:
     '''
     Represents a banking transaction categorizer.
@@ -24,8 +93,11 @@ class Categorizer:
         '''
         Creates a new transaction categorizer built from the specified data
         file or directory. Optionally, raw dictionary data may be fed to the
-        categorizer by specifying a value for `data_content` instead.
+        categorizer by specifying a value for `data_content` instead. Data files
+        are not read (and their patterns are not compiled) until the
+        categorizer is first used.
         '''
+        self._cache: dict[str, Optional[tuple[str, frozenset[str]]]] = {}
         if not data_path is None:
             full_data_path = os.path.expanduser(data_path)
             if os.path.isdir(full_data_path):
@@ -36,27 +108,110 @@ class Categorizer:
                 raise Exception(f'specified data path "{data_path}" does not exist')
             if not data_files:
                 raise Exception(f'specified data path "{data_path}" does not contain any data files')
-            self.raw_data = []
-            for df in data_files:
-                try:
-                    with open(df, 'r') as f:
-                        self.raw_data.append(yaml.safe_load(f.read()))
-                except Exception as e:
-                    raise Exception(f'unable to parse data file "{df}" - {e}')
+            self.data_files = data_files
         elif not data_content is None:
+            self.data_files = []
             self.raw_data = copy.deepcopy(data_content)
         else:
             raise Exception('please specify either `data_path` or `data_content`')
-        self.data = []
-        for pdata in self.raw_data:
-            if not 'data' in pdata:
-                raise Exception('one or more data files doesn\'t specify the "data" key')
-            rendered = copy.deepcopy(pdata)
-            for i, d in enumerate(pdata['data']):
-                if not 'name' in d or not 'match' in d:
-                    raise Exception('you need to specify "name" and "match"')
-                rendered['data'][i]['match'] = re.compile(d['match'].strip())
-            self.data.append(rendered)
+
+    @functools.cached_property
+    def _rules(self) -> list[tuple[str, Any, str, frozenset[str]]]:
+        '''
+        The flattened list of `(literal, search, name, tags)` rules derived
+        from `data`, in order of precedence. `literal` is a substring which
+        must be present in a description for the rule's pattern to match (see
+        `_required_literal()`), allowing most rules to be rejected without
+        running the regular expression at all.
+        '''
+        rules = []
+        for d1 in self.data:
+            for d2 in d1['data']:
+                rules.append((
+                    _required_literal(d2['match'].pattern),
+                    d2['match'].search,
+                    d2['name'],
+                    frozenset(d1.get('tags', ())) | frozenset(d2.get('tags', ()))
+                ))
+        return rules
+
+    def _cat(self, t: Transaction, merge: bool, tags: frozenset[str]) -> Transaction:
+        '''
+        Categorizes a single transaction on behalf of `cat()`, where `tags` is
+        the (already de-duplicated) set of additional tags to apply.
+        '''
+        match = self._match(t.desc.lower())
+        if match is None: return copy.deepcopy(t)
+        name, rule_tags = match
+        ntags = set(t.tags) if merge else set()
+        ntags.update(tags)
+        ntags.update(rule_tags)
+        return Transaction(
+            account = t.account,
+            amount  = t.amount,
+            balance = t.balance,
+            bank    = t.bank,
+            date    = t.date,
+            desc    = t.desc,
+            name    = name,
+            note    = t.note,
+            tags    = list(ntags)
+        )
+
+    @staticmethod
+    def _load_data_file(path: str) -> Any:
+        '''
+        Loads the contents of the specified YAML data file. Since JSON is much
+        quicker to parse than YAML, the contents are also saved to a
+        `{path}.cache.json` file alongside it, which is read instead for as long
+        as the data file's modification time (in nanoseconds) and size are
+        unchanged. Failing to read or write this cache is not an error.
+        '''
+        cache_path = path + '.cache.json'
+        stat = os.stat(path)
+        key = [stat.st_mtime_ns, stat.st_size]
+        try:
+            with open(cache_path, 'r') as f:
+                cache = json.load(f)
+            if cache['key'] == key: return cache['data']
+        except Exception:
+            pass
+        with open(path, 'r') as f:
+            data = yaml.load(f, Loader=_YAML_LOADER)
+        try:
+            content = json.dumps({'key': key, 'data': data})
+            # Only cache data which survives the round trip through JSON
+            # unchanged (YAML dates or non-string keys, for example, don't).
+            if json.loads(content)['data'] == data:
+                # Write to a temporary file first so that a concurrent reader
+                # never sees a partially-written cache.
+                tmp_path = f'{cache_path}.{os.getpid()}.tmp'
+                try:
+                    with open(tmp_path, 'w') as f:
+                        f.write(content)
+                    os.replace(tmp_path, cache_path)
+                finally:
+                    if os.path.exists(tmp_path): os.remove(tmp_path)
+        except Exception:
+            pass
+        return data
+
+    def _match(self, ldesc: str) -> Optional[tuple[str, frozenset[str]]]:
+        '''
+        Returns the `(name, tags)` pair of the first rule matching the specified
+        lowercase transaction description, or `None` if no rule matches. Bank
+        exports tend to repeat the same few descriptions many times, so results
+        are memoized in `_cache` (which is emptied once it grows too large).
+        '''
+        if ldesc in self._cache: return self._cache[ldesc]
+        res = None
+        for literal, search, name, rule_tags in self._rules:
+            if literal in ldesc and search(ldesc):
+                res = (name, rule_tags)
+                break
+        if len(self._cache) >= _MATCH_CACHE_SIZE: self._cache.clear()
+        self._cache[ldesc] = res
+        return res
 
     def cat(
         self,
@@ -71,28 +226,40 @@ class Categorizer:
         be added to all transactions.
         '''
         if isinstance(arg, Transaction):
-            cp = copy.deepcopy(arg)
-            desc = cp.desc.lower()
-            for d1 in self.data:
-                for d2 in d1['data']:
-                    if d2['match'].search(desc):
-                        ntags = cp.tags if merge else []
-                        if tags: ntags.extend(tags)
-                        if 'tags' in d1: ntags.extend(d1['tags'])
-                        if 'tags' in d2: ntags.extend(d2['tags'])
-                        return Transaction(
-                            account = cp.account,
-                            amount  = cp.amount,
-                            balance = cp.balance,
-                            bank    = cp.bank,
-                            date    = cp.date,
-                            desc    = cp.desc,
-                            name    = d2['name'],
-                            note    = cp.note,
-                            tags    = list(set(ntags))
-                        )
-            return cp
+            return self._cat(arg, merge, frozenset(tags))
         elif isinstance(arg, Transactions):
-            return Transactions([self.cat(t, merge=merge) for t in arg.items])
+            extra_tags = frozenset(tags)
+            return Transactions([self._cat(t, merge, extra_tags) for t in arg.items])
         else:
             raise Exception('unsupported input type')
+
+    @functools.cached_property
+    def data(self) -> list[dict]:
+        '''
+        The categorization data with each `match` pattern compiled, rendered
+        from `raw_data` on first access.
+        '''
+        data = []
+        for pdata in self.raw_data:
+            if not 'data' in pdata:
+                raise Exception('one or more data files doesn\'t specify the "data" key')
+            rendered = copy.deepcopy(pdata)
+            for i, d in enumerate(pdata['data']):
+                if not 'name' in d or not 'match' in d:
+                    raise Exception('you need to specify "name" and "match"')
+                rendered['data'][i]['match'] = re.compile(d['match'].strip())
+            data.append(rendered)
+        return data
+
+    @functools.cached_property
+    def raw_data(self) -> list[dict]:
+        '''
+        The raw contents of each data file, read on first access.
+        '''
+        raw_data = []
+        for df in self.data_files:
+            try:
+                raw_data.append(Categorizer._load_data_file(df))
+            except Exception as e:
+                raise Exception(f'unable to parse data file "{df}" - {e}')
+        return raw_data
@@ -2,10 +2,6 @@
 Contains definitions associated with plotting transactions.
 '''
 
-import copy
-import datetime
-import pandas as pd
-import plotly.figure_factory as ff
 import plotly.graph_objects as go
 import statistics
 
@@ -211,8 +207,9 @@ def tag_histogram(
         The title of the plot.
     '''
     fig = go.Figure()
-    tags = [tag for tag in transactions.tags() if not tag in hide]
-    stats = [transactions.filter(tags=tag).statistics() for tag in tags]
+    by_tag = transactions.group(by='tag')
+    tags = [tag for tag in sorted(by_tag) if not tag in hide]
+    stats = [by_tag[tag].statistics() for tag in tags]
     fig.add_trace(go.Bar(
         x = tags,
         y = [v[statistic] for v in stats]
@@ -242,8 +239,12 @@ def tag_distribution_plot(
       * title
         The title of the distribution plot.
     '''
-    tags = transactions.tags()
-    amounts = [[abs(t.amount) for t in transactions.filter(tags=tag)] for tag in tags]
+    # `plotly.figure_factory` is expensive to import (it pulls in pandas), so
+    # only pay for it when this plot is actually requested.
+    import plotly.figure_factory as ff
+    by_tag = transactions.group(by='tag')
+    tags = sorted(by_tag)
+    amounts = [[abs(t.amount) for t in by_tag[tag]] for tag in tags]
     if not bin_size is None:
         _bin_size = bin_size
     else:
@@ -281,12 +282,13 @@ def tag_pie_chart(
       * title
         The title of the plot.
     '''
+    by_tag = transactions.group(by='tag')
     tags = []
-    for tag in transactions.tags():
+    for tag in sorted(by_tag):
         if show and not tag in show: continue
         if hide and tag in hide: continue
         tags.append(tag)
-    stats = [transactions.filter(tags=tag).statistics() for tag in tags]
+    stats = [by_tag[tag].statistics() for tag in tags]
     fig = go.Figure(data=[go.Pie(
         labels = tags,
         values = [s[statistic] for s in stats]
@@ -323,14 +325,15 @@ def tag_trend_plot(
         Sets the title of the plot to the specified string.
     '''
     fig = go.Figure()
+    by_tag = transactions.group(by='tag')
     tags = []
-    for tag in transactions.tags():
+    for tag in sorted(by_tag):
         if hide and tag in hide: continue
         if show and not tag in show: continue
         tags.append(tag)
     num_traces = 0
     for tag in tags:
-        by_date = transactions.filter(tags=tag).group(by=f'date-{scale}')
+        by_date = by_tag[tag].group(by=f'date-{scale}')
         dates = [d[0] for d in by_date]
         stats = [by_date[d].statistics() for d in by_date]
         hovertexts = [by_date[d].hovertext() for d in by_date]
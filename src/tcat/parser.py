@@ -6,14 +6,41 @@ import csv
 import datetime
 import dateutil.parser as dp
 import glob
+import html
+import html.entities
 import io
+import numpy
 import os
 import re
 
-from typing import Any, Optional
+from typing import Any, Iterable, Optional, Union
 
 from .transaction import Transaction, Transactions
 
+# Matches HTML character references terminated by a semicolon. Unlike
+# `html.unescape()` alone, this leaves bare legacy entity names (such as the
+# "&COPY" in "SMITH&COPY CENTER") untouched.
+_CHAR_REFERENCE = re.compile(r'&(#\d+|#[xX][0-9a-fA-F]+|\w+);')
+
+# Translation tables which strip currency symbols (and optionally the
+# parentheses of accounting-style negative amounts) in one pass.
+_AMOUNT_CHARS = str.maketrans('', '', '$')
+_NEGATIVE_AMOUNT_CHARS = str.maketrans('', '', '$()')
+
+# Matches amounts whose commas are all valid thousands separators, so that
+# amounts like "1,5" or "1.234,56" are rejected rather than silently misread.
+_THOUSANDS_AMOUNT = re.compile(r'[-+]?\d{1,3}(,\d{3})*(\.\d*)?')
+
+def _unescape_reference(match: re.Match) -> str:
+    '''
+    Decodes a single character reference matched by `_CHAR_REFERENCE`, leaving
+    it as-is if it doesn't name a known entity.
+    '''
+    ref = match.group(1)
+    if ref.startswith('#') or ref + ';' in html.entities.html5:
+        return html.unescape(match.group())
+    return match.group()
+
 class Parser:
     '''
     Parses various banking output formats into uncategorized transaction
@@ -24,32 +51,72 @@ class Parser:
         Creates a new instance of a transaction parser.
         '''
 
+    @staticmethod
+    def _column_index(header: list[str], names: list[str]) -> int:
+        '''
+        Returns the index of the first column of the specified CSV header whose
+        (case-insensitive) name is one of `names`.
+        '''
+        for i, h in enumerate(header):
+            if h.lower() in names: return i
+        raise Exception(f'CSV content does not contain a column named any of {names}')
+
     @staticmethod
     def amount_from_str(dstr: str) -> float:
         '''
         Parses the specified dollar amount string into a usable float value.
+        Amounts may contain (valid) thousands separators, and may be negated by
+        enclosing them in parentheses.
         '''
-        no_currency = dstr.replace('$', '')
-        if '(' in dstr and ')' in dstr:
-            return round(-1 * float(no_currency.replace('(', '').replace(')', '')), 2)
+        negative = '(' in dstr and ')' in dstr
+        amount = dstr.translate(_NEGATIVE_AMOUNT_CHARS if negative else _AMOUNT_CHARS)
+        if ',' in amount:
+            if _THOUSANDS_AMOUNT.fullmatch(amount.strip()) is None:
+                raise Exception(f'unable to parse dollar amount "{dstr}" - invalid thousands separators')
+            amount = amount.replace(',', '')
+        if negative:
+            return round(-float(amount), 2)
         else:
-            return round(float(no_currency), 2)
+            return round(float(amount), 2)
 
     @staticmethod
     def amount_to_str(amount: float) -> str:
         '''
         Converts a monetary amount to its string representation.
         '''
-        ra = abs(round(amount, 2))
-        if amount < 0: return '-${0:.2f}'.format(ra)
-        return '${0:.2f}'.format(ra)
+        sign = '-' if amount < 0 else ''
+        return f'{sign}${abs(round(amount, 2)):.2f}'
 
     @staticmethod
     def clean_desc(desc: str) -> str:
         '''
-        Cleans unwanted characters from a transaction description.
+        Cleans unwanted characters from a transaction description, such as
+        HTML character references.
+        '''
+        return _CHAR_REFERENCE.sub(_unescape_reference, desc.strip()).replace('%%', '%')
+
+    @staticmethod
+    def date_from_str(dstr: str) -> datetime.date:
+        '''
+        Parses the specified date string into a date. The common `%m/%d/%Y`,
+        `%Y/%m/%d`, and ISO `%Y-%m-%d` forms are handled directly, with any
+        other format left to `dateutil`.
         '''
-        return desc.strip().replace('&#39;', "'").replace('&amp;', '&').replace('%%', '%')
+        if len(dstr) == 10 and dstr[4] == '-' and dstr[7] == '-':
+            try:
+                return datetime.date.fromisoformat(dstr)
+            except ValueError:
+                pass
+        parts = dstr.split('/')
+        if len(parts) == 3 and all(p.isdigit() for p in parts):
+            try:
+                if len(parts[2]) == 4:
+                    return datetime.date(int(parts[2]), int(parts[0]), int(parts[1]))
+                elif len(parts[0]) == 4:
+                    return datetime.date(int(parts[0]), int(parts[1]), int(parts[2]))
+            except ValueError:
+                pass
+        return dp.parse(dstr).date()
 
     def parse_credit_csv(
         self,
@@ -96,20 +163,20 @@ class Parser:
                 the_card_name = card_name
                 the_card_issuer = card_issuer
             try:
-                with open(p, 'r') as f:
-                    content = f.read()
+                f = open(p, 'r')
             except Exception as e:
                 raise Exception(f'unable to read CSV file "{p}" - {e}')
             try:
-                transaction_sets.append(
-                    self.parse_credit_csv_content(
-                        card_name     = the_card_name,
-                        card_issuer   = the_card_issuer,
-                        content       = content,
-                        end_balance   = end_balance,
-                        start_balance = start_balance
+                with f:
+                    transaction_sets.append(
+                        self.parse_credit_csv_content(
+                            card_name     = the_card_name,
+                            card_issuer   = the_card_issuer,
+                            content       = f,
+                            end_balance   = end_balance,
+                            start_balance = start_balance
+                        )
                     )
-                )
             except Exception as e:
                 raise Exception(f'unable to parse CSV file {p} - {e}')
         return Transactions.merge(*transaction_sets)
@@ -118,12 +185,13 @@ class Parser:
         self,
         card_name: str,
         card_issuer: str,
-        content: str,
+        content: Union[str, Iterable[str]],
         end_balance: Optional[float] = None,
         start_balance: Optional[float] = None) -> Transactions:
         '''
-        A sister method of `parse_credit_csv()`, this function parses the string
-        content read from a single CSV file.
+        A sister method of `parse_credit_csv()`, this function parses the
+        content of a single CSV file, given either as a string or as an
+        iterable of lines (such as an open file), which is read row by row.
         '''
         if end_balance is None and start_balance is None:
             ref_bal_start = True
@@ -137,40 +205,44 @@ class Parser:
         else:
             raise Exception('only one of `start_balance` or `end_balance` may be specified')
         try:
-            csv_data = csv.DictReader(io.StringIO(content), restkey='misc')
+            csv_data = csv.reader(io.StringIO(content) if isinstance(content, str) else content)
+            header = next(csv_data, [])
         except Exception as e:
             raise Exception(f'unable to parse CSV content - {e}')
-        tdata = []
-        for entry in csv_data:
-            amount_str  = next(entry[k].strip() for k in entry.keys() if k.lower() in ['amt', 'amount'])
-            date_str    = next(entry[k].strip() for k in entry.keys() if k.lower() == 'date')
-            desc        = ' '.join(entry[k] for k in entry.keys() if k.lower() in ['desc', 'description', 'memo', 'name'])
-            if 'misc' in entry and entry['misc']:
-                note = f'Additional CSV Data: {entry["misc"]}'
-            else:
-                note = None
-            tdata.append({
-                'account': card_name,
-                'amount': Parser.amount_from_str(amount_str),
-                'bank': card_issuer,
-                'date': dp.parse(date_str).date(),
-                'desc': Parser.clean_desc(desc),
-                'note': note
-            })
-        tdata = sorted(tdata, key = lambda x: x['date'], reverse = not ref_bal_start)
+        if not header: return Transactions([])
+        amount_col = Parser._column_index(header, ['amt', 'amount'])
+        date_col   = Parser._column_index(header, ['date'])
+        desc_cols  = [i for i, h in enumerate(header) if h.lower() in ['desc', 'description', 'memo', 'name']]
         transactions = []
-        for i, entry in enumerate(tdata):
-            if i == 0:
-                if ref_bal_start:
-                    entry['balance'] = ref_bal + entry['amount']
-                else:
-                    entry['balance'] = ref_bal
+        for row in csv_data:
+            if not row: continue
+            desc = ' '.join(row[i] for i in desc_cols)
+            misc = row[len(header):]
+            if misc:
+                note = f'Additional CSV Data: {misc}'
             else:
-                if ref_bal_start:
-                    entry['balance'] = tdata[i - 1]['balance'] + entry['amount']
-                else:
-                    entry['balance'] = tdata[i - 1]['balance'] - tdata[i - 1]['amount']
-            transactions.append(Transaction(**entry))
+                note = None
+            transactions.append(Transaction(
+                account = card_name,
+                amount  = Parser.amount_from_str(row[amount_col].strip()),
+                balance = 0.0,
+                bank    = card_issuer,
+                date    = Parser.date_from_str(row[date_col].strip()),
+                desc    = Parser.clean_desc(desc),
+                note    = note
+            ))
+        # Balances are filled in once the transactions are in (reverse)
+        # chronological order, as a running sum walking away from the reference
+        # balance (which, when given as the end balance, is that of the last
+        # transaction itself).
+        transactions.sort(key = lambda t: t.date, reverse = not ref_bal_start)
+        amounts = numpy.fromiter((t.amount for t in transactions), dtype=numpy.float64, count=len(transactions))
+        if ref_bal_start:
+            balances = numpy.cumsum(numpy.concatenate(([ref_bal], amounts)))[1:]
+        else:
+            balances = numpy.cumsum(numpy.concatenate(([ref_bal], -amounts)))[:-1]
+        for t, balance in zip(transactions, balances.tolist()):
+            t.balance = balance
         return Transactions(transactions).sort()
 
     def parse_transaction_csv(self, path: str, account: Optional[str] = None, bank: Optional[str] = None) -> Transactions:
@@ -203,44 +275,49 @@ class Parser:
                 the_account = account
                 the_bank = bank
             try:
-                with open(p, 'r') as f:
-                    content = f.read()
+                f = open(p, 'r')
             except Exception as e:
                 raise Exception(f'unable to read CSV file "{p}" - {e}')
             try:
-                transaction_sets.append(
-                    self.parse_transaction_csv_content(the_account, the_bank, content)
-                )
+                with f:
+                    transaction_sets.append(
+                        self.parse_transaction_csv_content(the_account, the_bank, f)
+                    )
             except Exception as e:
                 raise Exception(f'unable to parse CSV file {p} - {e}')
         return Transactions.merge(*transaction_sets)
 
-    def parse_transaction_csv_content(self, account: str, bank: str, content: str) -> Transactions:
+    def parse_transaction_csv_content(self, account: str, bank: str, content: Union[str, Iterable[str]]) -> Transactions:
         '''
         A sister method of `parse_transaction_csv()`, this function parses the
-        string content read from a single CSV file.
+        content of a single CSV file, given either as a string or as an
+        iterable of lines (such as an open file), which is read row by row.
         '''
         try:
-            csv_data = csv.DictReader(io.StringIO(content), restkey='misc')
+            csv_data = csv.reader(io.StringIO(content) if isinstance(content, str) else content)
+            header = next(csv_data, [])
         except Exception as e:
             raise Exception(f'unable to parse CSV content - {e}')
+        if not header: return Transactions([])
+        amount_col  = Parser._column_index(header, ['amt', 'amount'])
+        balance_col = Parser._column_index(header, ['bal', 'balance'])
+        date_col    = Parser._column_index(header, ['date'])
+        desc_col    = Parser._column_index(header, ['desc', 'description'])
         transactions = []
-        for entry in csv_data:
-            amount_str  = next(entry[k].strip() for k in entry.keys() if k.lower() in ['amt', 'amount'])
-            balance_str = next(entry[k].strip() for k in entry.keys() if k.lower() in ['bal', 'balance'])
-            date_str    = next(entry[k].strip() for k in entry.keys() if k.lower() == 'date')
-            desc        = next(entry[k] for k in entry.keys() if k.lower() in ['desc', 'description'])
-            if 'misc' in entry and entry['misc']:
-                note = f'Additional CSV Data: {entry["misc"]}'
+        for row in csv_data:
+            if not row: continue
+            misc = row[len(header):]
+            if misc:
+                note = f'Additional CSV Data: {misc}'
             else:
                 note = None
             transactions.append(Transaction(
                 account = account,
-                amount  = Parser.amount_from_str(amount_str),
-                balance = Parser.amount_from_str(balance_str),
+                amount  = Parser.amount_from_str(row[amount_col].strip()),
+                balance = Parser.amount_from_str(row[balance_col].strip()),
                 bank    = bank,
-                date    = dp.parse(date_str).date(),
-                desc    = Parser.clean_desc(desc),
+                date    = Parser.date_from_str(row[date_col].strip()),
+                desc    = Parser.clean_desc(row[desc_col]),
                 note    = note
             ))
         return Transactions(transactions)
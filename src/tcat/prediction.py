@@ -4,7 +4,7 @@ Contains definitions useful for the prediction of financial trends.
 
 from __future__ import annotations
 
-import dateutil.relativedelta
+import datetime
 import math
 import numpy
 import statistics
@@ -14,6 +14,41 @@ from typing import Optional
 from .transaction import Transaction, Transactions
 
 
+def _amounts(stats: dict, n: int, positive: bool) -> list[float]:
+    '''
+    Draws `n` normally-distributed amounts (rounded to the cent) according to
+    the specified `Transactions.statistics()` output. Amounts must be
+    non-negative if `positive` is `True` and non-positive otherwise, with any
+    draws of the wrong sign being redrawn.
+    '''
+    amounts = []
+    while len(amounts) < n:
+        draws = numpy.round(numpy.random.normal(
+            loc   = stats['mean_amount'],
+            scale = stats['stdev_amount'],
+            size  = n - len(amounts)
+        ), 2)
+        amounts.extend((draws[draws >= 0] if positive else draws[draws <= 0]).tolist())
+    return amounts
+
+def _daily_counts(stats: dict, days: int, max_per_day: Optional[int]) -> list[int]:
+    '''
+    Draws the number of transactions made on each of the specified number of
+    days according to the specified `Transactions.statistics()` output, never
+    exceeding `max_per_day` (or, if `None`, the mean daily frequency plus two
+    standard deviations).
+    '''
+    if stats['count'] < 1: return [0] * days
+    if max_per_day is None:
+        max_per_day = math.ceil(stats['mean_freq_daily'] + (2.0 * stats['stdev_freq_daily']))
+    draws = numpy.rint(numpy.random.normal(
+        loc   = stats['mean_freq_daily'],
+        scale = stats['stdev_freq_daily'],
+        size  = days
+    ))
+    return numpy.clip(draws, 0, max_per_day).astype(int).tolist()
+
+
 class Simulator:
     '''
     Simulates the continuation of balance trends from a given collection of
@@ -80,84 +115,47 @@ class Simulator:
           this value will be taken to be the mean daily frequency plus two
           standard deviations.
         '''
-        generated = {}
-        for day in range(days):
-            for bank, bank_data in self.data.items():
-                if not bank in generated: generated[bank] = {}
-                for account, account_data in bank_data.items():
-                    # Setup
-                    if not account in generated[bank]: generated[bank][account] = []
-                    current_date = account_data['zero_date'] + dateutil.relativedelta.relativedelta(days = day + 1)
-                    if max_per_day is None:
-                        if account_data['dstats']['count'] > 0:
-                            dmax = math.ceil(
-                                account_data['dstats']['mean_freq_daily'] + (2.0 * account_data['dstats']['stdev_freq_daily'])
-                            )
-                        if account_data['wstats']['count'] > 0:
-                            wmax = math.ceil(
-                                account_data['wstats']['mean_freq_daily'] + (2.0 * account_data['wstats']['stdev_freq_daily'])
-                            )
-                    else:
-                        dmax = max_per_day
-                        wmax = max_per_day
-                    if len(generated[bank][account]) > 1:
-                        current_balance = generated[bank][account][-1].balance
-                    else:
-                        current_balance = account_data['zero_balance']
+        res = []
+        for bank, bank_data in self.data.items():
+            for account, account_data in bank_data.items():
+                # The number of deposits and withdrawals made on each simulated
+                # day (and their amounts) are drawn for the whole run up front,
+                # with a handful of vectorized draws per account.
+                dcounts = _daily_counts(account_data['dstats'], days, max_per_day)
+                wcounts = _daily_counts(account_data['wstats'], days, max_per_day)
+                deposit_amounts = iter(_amounts(account_data['dstats'], sum(dcounts), positive = True))
+                withdrawal_amounts = iter(_amounts(account_data['wstats'], sum(wcounts), positive = False))
+                simulated_account = account + account_suffix
+                zero_date = account_data['zero_date']
+                current_balance = account_data['zero_balance']
+                for day in range(days):
+                    current_date = zero_date + datetime.timedelta(days = day + 1)
                     # Deposits
-                    if account_data['dstats']['count'] > 0:
-                        number_of_deposits = round(numpy.random.normal(
-                            loc = account_data['dstats']['mean_freq_daily'],
-                            scale = account_data['dstats']['stdev_freq_daily']
+                    for i in range(dcounts[day]):
+                        amount = next(deposit_amounts)
+                        current_balance += amount
+                        res.append(Transaction(
+                            account = simulated_account,
+                            amount = amount,
+                            balance = current_balance,
+                            bank = bank,
+                            date = current_date,
+                            desc = f'SIMULATED DEPOSIT [{bank}/{account}] {day}-{i}',
+                            name = 'Simulated Deposit',
+                            tags = ['simulated']
                         ))
-                        if number_of_deposits < 0: number_of_deposits = 0
-                        if number_of_deposits > dmax: number_of_deposits = dmax
-                        for i in range(number_of_deposits):
-                            amount = -1.0
-                            while amount < 0:
-                                amount = round(numpy.random.normal(
-                                    loc = account_data['dstats']['mean_amount'],
-                                    scale = account_data['dstats']['stdev_amount']
-                                ), 2)
-                            current_balance += amount
-                            generated[bank][account].append(Transaction(
-                                account = account + account_suffix,
-                                amount = amount,
-                                balance = current_balance,
-                                bank = bank,
-                                date = current_date,
-                                desc = f'SIMULATED DEPOSIT [{bank}/{account}] {day}-{i}',
-                                name = 'Simulated Deposit',
-                                tags = ['simulated']
-                            ))
                     # Withdrawals
-                    if account_data['wstats']['count'] > 0:
-                        number_of_withdrawals = round(numpy.random.normal(
-                            loc = account_data['wstats']['mean_freq_daily'],
-                            scale = account_data['wstats']['stdev_freq_daily']
+                    for i in range(wcounts[day]):
+                        amount = next(withdrawal_amounts)
+                        current_balance += amount
+                        res.append(Transaction(
+                            account = simulated_account,
+                            amount = amount,
+                            balance = current_balance,
+                            bank = bank,
+                            date = current_date,
+                            desc = f'SIMULATED WITHDRAWAL [{bank}/{account}] {day}-{i}',
+                            name = 'Simulated Withdrawal',
+                            tags = ['simulated']
                         ))
-                        if number_of_withdrawals < 0: number_of_withdrawals = 0
-                        if number_of_withdrawals > wmax: number_of_withdrawals = wmax
-                        for i in range(number_of_withdrawals):
-                            amount = 1.0
-                            while amount > 0:
-                                amount = round(numpy.random.normal(
-                                    loc = account_data['wstats']['mean_amount'],
-                                    scale = account_data['wstats']['stdev_amount']
-                                ), 2)
-                            current_balance += amount
-                            generated[bank][account].append(Transaction(
-                                account = account + account_suffix,
-                                amount = amount,
-                                balance = current_balance,
-                                bank = bank,
-                                date = current_date,
-                                desc = f'SIMULATED WITHDRAWAL [{bank}/{account}] {day}-{i}',
-                                name = 'Simulated Withdrawal',
-                                tags = ['simulated']
-                            ))
-        res = []
-        for gbank, gbank_data in generated.items():
-            for gaccount, gaccount_data in gbank_data.items():
-                res.extend(gaccount_data)
         return Transactions(res).sort()
@@ -4,6 +4,8 @@ Contains the definition of a transaction object.
 
 from __future__ import annotations
 
+import calendar
+import collections
 import copy
 import dataclasses
 import datetime
@@ -14,6 +16,7 @@ import math
 import numpy
 import os
 import statistics
+import sys
 from typing import Any, Optional, Union
 
 DATE_FORMAT = '%Y/%m/%d'
@@ -55,6 +58,15 @@ class Transaction:
     note: Optional[str] = dataclasses.field(compare=False, default=None)
     tags: list[str] = dataclasses.field(compare=False, default_factory=list)
 
+    def __deepcopy__(self, memo: dict) -> Transaction:
+        '''
+        Returns a deep copy of the transaction. Every field other than `tags`
+        is immutable, so only the list of tags needs to be copied.
+        '''
+        cp = copy.copy(self)
+        cp.tags = list(self.tags)
+        return cp
+
     def __getitem__(self, key: str) -> Any:
         '''
         Allows one to access fields of a transaction via dictionary syntax.
@@ -73,6 +85,17 @@ class Transaction:
         '''
         return len(self.tags)
 
+    def __post_init__(self):
+        '''
+        Interns the low-cardinality string fields of the transaction (`account`,
+        `bank`, `name`, and each tag), so that the many transactions sharing a
+        value also share a single string object, which compares by identity.
+        '''
+        if isinstance(self.account, str): self.account = sys.intern(self.account)
+        if isinstance(self.bank, str): self.bank = sys.intern(self.bank)
+        if isinstance(self.name, str): self.name = sys.intern(self.name)
+        self.tags = [sys.intern(t) if isinstance(t, str) else t for t in self.tags]
+
     def __str__(self) -> str:
         '''
         Returns the string representation of the transaction. This is an alias
@@ -94,9 +117,11 @@ class Transaction:
         Creates a new transaction from a dictionary object containing unparsed
         date strings.
         '''
-        rep = copy.deepcopy(jsondict)
+        rep = dict(jsondict)
         if 'bal' in rep: rep['balance'] = rep.pop('bal')
-        rep['date'] = datetime.datetime.strptime(rep['date'], DATE_FORMAT).date()
+        # Dates are stored as `DATE_FORMAT` (`%Y/%m/%d`) strings, which are
+        # much quicker to split apart than to run through `strptime()`.
+        rep['date'] = datetime.date(*map(int, rep['date'].split('/')))
         return Transaction(**rep)
 
     def has_note(self) -> bool:
@@ -131,8 +156,9 @@ class Transaction:
         Converts the transaction into a dictionary where the `date` field is set
         to its string representation.
         '''
-        rep = copy.deepcopy(self.__dict__)
-        rep['date'] = rep['date'].strftime(DATE_FORMAT)
+        rep = dict(self.__dict__)
+        rep['date'] = self.date.strftime(DATE_FORMAT)
+        rep['tags'] = list(self.tags)
         return rep
 
     def to_json(self) -> str:
@@ -150,6 +176,16 @@ class Transactions:
     '''
     items: list[Transaction]
 
+    def __add__(self, other: Transactions) -> Transactions:
+        '''
+        Concatenates two collections of transactions, preserving their order.
+        Unlike `merge()`, no duplicates are removed and the result isn't
+        sorted, and the transactions themselves are shared with the operands
+        rather than copied.
+        '''
+        if not isinstance(other, Transactions): return NotImplemented
+        return Transactions(self.items + other.items)
+
     def __getitem__(self, index: int) -> Transaction:
         '''
         Allows one to access transactions using index notation.
@@ -168,18 +204,105 @@ class Transactions:
         '''
         return len(self.items)
 
+    def _values(self, key: str, absolute_value: bool = False) -> numpy.ndarray:
+        '''
+        Returns the values of the specified numeric field (`amount` or
+        `balance`) of each transaction as a NumPy array. If `absolute_value` is
+        set to true, the "sign" of each value will be ignored.
+        '''
+        values = numpy.fromiter((t[key] for t in self.items), dtype=numpy.float64, count=len(self.items))
+        return numpy.abs(values) if absolute_value else values
+
+    @staticmethod
+    def _bins(items: list[Transaction], key: str, ranges: list[tuple[Any, Any]]) -> list[list[Transaction]]:
+        '''
+        Splits a list of transactions sorted by the specified field into the
+        transactions falling within each of the specified (sorted) half-open
+        `(lower, upper)` ranges. The boundaries of each range are located via a
+        binary search over the field values (dates are compared by their
+        ordinal), so each transaction is assigned to at most one range without
+        comparing it against each range in Python.
+        '''
+        if key == 'date':
+            values = numpy.fromiter((t.date.toordinal() for t in items), dtype=numpy.int64, count=len(items))
+            bounds = numpy.array([(l.toordinal(), u.toordinal()) for l, u in ranges], dtype=numpy.int64)
+        else:
+            values = Transactions(items)._values(key)
+            bounds = numpy.array(ranges, dtype=numpy.float64)
+        bounds = bounds.reshape(-1, 2)
+        starts = numpy.searchsorted(values, bounds[:, 0], side='left').tolist()
+        ends   = numpy.searchsorted(values, bounds[:, 1], side='left').tolist()
+        bins = []
+        i = 0
+        for start, end in zip(starts, ends):
+            i = max(i, start)
+            j = max(i, end)
+            bins.append(items[i:j])
+            i = j
+        return bins
+
+    @staticmethod
+    def _date_bounds(datestr: str) -> tuple[datetime.date, datetime.date]:
+        '''
+        Returns the first and last dates (inclusive) covered by the specified
+        date string of the form `%Y`, `%Y/%m`, or `%Y/%m/%d`.
+        '''
+        sd = list(map(int, datestr.split('/')))[:3]
+        if len(sd) == 1:
+            return datetime.date(sd[0], 1, 1), datetime.date(sd[0], 12, 31)
+        elif len(sd) == 2:
+            return datetime.date(sd[0], sd[1], 1), datetime.date(sd[0], sd[1], calendar.monthrange(sd[0], sd[1])[1])
+        day = datetime.date(*sd)
+        return day, day
+
+    @staticmethod
+    def _datesteps(by: str, first: datetime.date, last: datetime.date, interval: int = 1) -> list[datetime.date]:
+        '''
+        Returns the boundaries of the consecutive time periods used when
+        grouping transactions dated from `first` to `last` by the specified
+        `date-*` criteria (see `group()`).
+        '''
+        freq = {
+            'date-daily': (dateutil.rrule.DAILY, first, dateutil.relativedelta.relativedelta(days=1)),
+            'date-monthly': (dateutil.rrule.MONTHLY, first.replace(day=1), dateutil.relativedelta.relativedelta(months=1)),
+            'date-weekly': (dateutil.rrule.WEEKLY, first, dateutil.relativedelta.relativedelta(weeks=1)),
+            'date-yearly': (dateutil.rrule.YEARLY, first.replace(month=1, day=1), dateutil.relativedelta.relativedelta(years=1))
+        }
+        return [d.date() for d in dateutil.rrule.rrule(
+            freq[by][0],
+            dtstart  = freq[by][1],
+            interval = interval,
+            until    = last + freq[by][2],
+            wkst     = dateutil.rrule.SU
+        )]
+
+    def _freq_counts(self, scale: str) -> list[int]:
+        '''
+        Returns the number of transactions within each period of the specified
+        time scale (`daily`, `weekly`, `monthly`, or `yearly`), including
+        periods without any transactions.
+        '''
+        if not scale in ['daily', 'weekly', 'monthly', 'yearly']:
+            raise Exception('please specify an appropriate time scale')
+        if len(self.items) < 1: return []
+        # Only the size of each period is needed, so rather than grouping (and
+        # copying) the transactions themselves, the sorted dates are binned by
+        # a binary search for each period boundary.
+        dates = numpy.sort(numpy.fromiter((t.date.toordinal() for t in self.items), dtype=numpy.int64, count=len(self.items)))
+        datesteps = Transactions._datesteps(f'date-{scale}', datetime.date.fromordinal(int(dates[0])), datetime.date.fromordinal(int(dates[-1])))
+        bounds = numpy.array([d.toordinal() for d in datesteps], dtype=numpy.int64)
+        return numpy.diff(numpy.searchsorted(dates, bounds, side='left')).tolist()
+
     def accounts(self, bank: Optional[str] = None) -> list[str]:
         '''
         Returns the set of all accounts associated with this list. Optionally,
         the collection may be limited by those associated with a particular
         bank (case insensitive).
         '''
-        acc = []
-        for t in self:
-            if not bank is None and bank:
-                if t.bank.lower() != bank.lower(): continue
-            acc.append(t.account)
-        return list(set(acc))
+        if not bank is None and bank:
+            bank_l = bank.lower()
+            return list(set(t.account for t in self.items if t.bank.lower() == bank_l))
+        return list(set(t.account for t in self.items))
 
     def banks(self) -> list[str]:
         '''
@@ -189,27 +312,17 @@ class Transactions:
 
     def counts(self) -> dict[str, int]:
         '''
-        Returns a dictionary of name-count pairs within this collection of transactions.
+        Returns a dictionary of name-count pairs within this collection of
+        transactions, ordered from the most to the least common name.
+        Transactions without a name are counted under `UNKNOWN`.
         '''
-        counts = {}
-        for t in self:
-            if not t.name is None and t.name:
-                if t.name in counts:
-                    counts[t.name] += 1
-                else:
-                    counts[t.name] = 1
-            else:
-                if 'UNKNOWN' in counts:
-                    counts['UNKNOWN'] += 1
-                else:
-                    counts['UNKNOWN'] = 1
-        return counts
+        return dict(collections.Counter(t.name or 'UNKNOWN' for t in self.items).most_common())
 
     def coverage(self) -> float:
         '''
         Returns the percentage of transactions which have been categorized.
         '''
-        puncat = len(self.uncategorized()) / len(self.items)
+        puncat = sum(1 for t in self.items if not t.tags) / len(self.items)
         return round((1 - puncat) * 100, 2)
 
     def dates(self) -> list[datetime.date]:
@@ -235,7 +348,7 @@ class Transactions:
           * note
           * dollar amount
           * date
-          * Some combination of the above (applied in that order)
+          * Some combination of the above (all of which must match)
         In addition to functions/lambdas you can also specify:
           * A string for the `account` or `bank` keyword arguments. These
             comparisons are case-insensitive.
@@ -279,142 +392,99 @@ class Transactions:
             if not key in ALLOWED_KEYS:
                 raise Exception(f'unknown filter key "{key}"')
         if len(self.items) < 2: return copy.deepcopy(self)
-        most_recent_date = max(self.dates())
-        filtered = []
         negate = 'negate' in kwargs and kwargs['negate']
-        for t in self:
-            if 'bank' in kwargs:
-                if isinstance(kwargs['bank'], str):
-                    if negate:
-                        if kwargs['bank'].lower() == t.bank.lower(): continue
-                    else:
-                        if kwargs['bank'].lower() != t.bank.lower(): continue
-                else:
-                    if negate:
-                        if kwargs['bank'](t.bank): continue
-                    else:
-                        if not kwargs['bank'](t.bank): continue
-            if 'account' in kwargs:
-                if isinstance(kwargs['account'], str):
-                    if negate:
-                        if kwargs['account'].lower() == t.account.lower(): continue
-                    else:
-                        if kwargs['account'].lower() != t.account.lower(): continue
-                else:
-                    if negate:
-                        if kwargs['account'](t.account): continue
-                    else:
-                        if not kwargs['account'](t.account): continue
-            if 'tags' in kwargs:
-                if isinstance(kwargs['tags'], str):
-                    if negate:
-                        if kwargs['tags'] in t.tags: continue
-                    else:
-                        if not kwargs['tags'] in t.tags: continue
-                elif isinstance(kwargs['tags'], list):
-                    if negate:
-                        if (True in [(tag in t.tags) for tag in kwargs['tags']]): continue
-                    else:
-                        if not (True in [(tag in t.tags) for tag in kwargs['tags']]): continue
-                else:
-                    if negate:
-                        if kwargs['tags'](set(t.tags)): continue
-                    else:
-                        if not kwargs['tags'](set(t.tags)): continue
-            if 'name' in kwargs:
-                if isinstance(kwargs['name'], str):
-                    if negate:
-                        if t.is_named() and kwargs['name'].lower() in t.name.lower(): continue
-                    else:
-                        if not t.is_named() or not kwargs['name'].lower() in t.name.lower(): continue
-                else:
-                    if negate:
-                        if kwargs['name'](t.name): continue
-                    else:
-                        if not kwargs['name'](t.name): continue
-            if 'desc' in kwargs:
-                if isinstance(kwargs['desc'], str):
-                    if negate:
-                        if kwargs['desc'].lower() in t.desc.lower(): continue
-                    else:
-                        if not kwargs['desc'].lower() in t.desc.lower(): continue
-                else:
-                    if negate:
-                        if kwargs['desc'](t.desc): continue
-                    else:
-                        if not kwargs['desc'](t.desc): continue
-            if 'note' in kwargs:
-                if isinstance(kwargs['note'], str):
-                    if negate:
-                        if t.has_note() and kwargs['note'].lower() in t.note.lower(): continue
-                    else:
-                        if not t.has_note() or not kwargs['note'].lower() in t.note.lower(): continue
-                else:
-                    if negate:
-                        if kwargs['note'](t.note): continue
-                    else:
-                        if not kwargs['note'](t.note): continue
-            if 'amount' in kwargs:
-                if isinstance(kwargs['amount'], str):
-                    if kwargs['amount'].lower() in ['+', 'd', 'deposit']:
-                        if negate:
-                            if t.amount > 0: continue
-                        else:
-                            if t.amount <= 0: continue
-                    if kwargs['amount'].lower() in ['-', 'w', 'withdrawal']:
-                        if negate:
-                            if t.amount < 0: continue
-                        else:
-                            if t.amount >= 0: continue
-                elif isinstance(kwargs['amount'], tuple):
-                    if negate:
-                        if t.amount >= kwargs['amount'][0] and t.amount <= kwargs['amount'][1]: continue
-                    else:
-                        if t.amount < kwargs['amount'][0] or t.amount > kwargs['amount'][1]: continue
-                else:
-                    if negate:
-                        if kwargs['amount'](t.amount): continue
-                    else:
-                        if not kwargs['amount'](t.amount): continue
-            if 'date' in kwargs:
-                if isinstance(kwargs['date'], int):
-                    if negate:
-                        if (most_recent_date - t.date).days <= kwargs['date']: continue
-                    else:
-                        if (most_recent_date - t.date).days > kwargs['date']: continue
-                elif isinstance(kwargs['date'], str):
-                    sd = list(map(int, kwargs['date'].split('/')))
-                    if negate:
-                        if len(sd) >= 1 and t.date.year == sd[0]: continue
-                        if len(sd) >= 2 and t.date.month == sd[1]: continue
-                        if len(sd) >= 3 and t.date.day == sd[2]: continue
-                    else:
-                        if len(sd) >= 1 and t.date.year != sd[0]: continue
-                        if len(sd) >= 2 and t.date.month != sd[1]: continue
-                        if len(sd) >= 3 and t.date.day != sd[2]: continue
-                elif isinstance(kwargs['date'], tuple):
-                    sd1 = list(map(int, kwargs['date'][0].split('/')))
-                    while len(sd1) < 3: sd1.append(1)
-                    sd2 = list(map(int, kwargs['date'][1].split('/')))
-                    if len(sd2) < 2: sd2.append(12)
-                    if len(sd2) < 3: sd2.append(DAYS_IN_MONTH[sd2[1] - 1])
-                    lowerbound = datetime.date(*sd1)
-                    upperbound = datetime.date(*sd2)
-                    if negate:
-                        if t.date >= lowerbound and t.date <= upperbound: continue
-                    else:
-                        if t.date < lowerbound or t.date > upperbound: continue
-                elif isinstance(kwargs['date'], datetime.date):
-                    if negate:
-                        if t.date == kwargs['date']: continue
-                    else:
-                        if t.date != kwargs['date']: continue
-                else:
-                    if negate:
-                        if kwargs['date'](t.date): continue
-                    else:
-                        if not kwargs['date'](t.date): continue
-            filtered.append(copy.deepcopy(t))
+        # Each predicate is paired with a rough cost so that the cheapest
+        # checks can reject a transaction before the more expensive ones run:
+        # 0 = plain comparison, 1 = tag lookup, 2 = case-insensitive substring
+        # search, 3 = user-provided function.
+        predicates = []
+        if 'bank' in kwargs:
+            bank = kwargs['bank']
+            if isinstance(bank, str):
+                # Banks (and accounts) take very few distinct values, so it's
+                # cheaper to resolve which of them match up front than to
+                # lowercase the field of every transaction.
+                bank_l = bank.lower()
+                matching_banks = set(b for b in self.banks() if b.lower() == bank_l)
+                predicates.append((0, lambda t: t.bank in matching_banks))
+            else:
+                predicates.append((3, lambda t: bank(t.bank)))
+        if 'account' in kwargs:
+            account = kwargs['account']
+            if isinstance(account, str):
+                account_l = account.lower()
+                matching_accounts = set(a for a in self.accounts() if a.lower() == account_l)
+                predicates.append((0, lambda t: t.account in matching_accounts))
+            else:
+                predicates.append((3, lambda t: account(t.account)))
+        if 'tags' in kwargs:
+            tags = kwargs['tags']
+            if isinstance(tags, str):
+                predicates.append((1, lambda t: tags in t.tags))
+            elif isinstance(tags, list):
+                tag_set = set(tags)
+                predicates.append((1, lambda t: not tag_set.isdisjoint(t.tags)))
+            else:
+                predicates.append((3, lambda t: tags(set(t.tags))))
+        if 'name' in kwargs:
+            name = kwargs['name']
+            if isinstance(name, str):
+                # Names repeat as often as banks and accounts do, so matching
+                # names are also resolved once up front.
+                name_l = name.lower()
+                matching_names = set(n for n in self.names() if n and name_l in n.lower())
+                predicates.append((0, lambda t: t.name in matching_names))
+            else:
+                predicates.append((3, lambda t: name(t.name)))
+        if 'desc' in kwargs:
+            desc = kwargs['desc']
+            if isinstance(desc, str):
+                desc_l = desc.lower()
+                predicates.append((2, lambda t: desc_l in t.desc.lower()))
+            else:
+                predicates.append((3, lambda t: desc(t.desc)))
+        if 'note' in kwargs:
+            note = kwargs['note']
+            if isinstance(note, str):
+                note_l = note.lower()
+                predicates.append((2, lambda t: t.has_note() and note_l in t.note.lower()))
+            else:
+                predicates.append((3, lambda t: note(t.note)))
+        if 'amount' in kwargs:
+            amount = kwargs['amount']
+            if isinstance(amount, str):
+                if amount.lower() in ['+', 'd', 'deposit']:
+                    predicates.append((0, lambda t: t.amount > 0))
+                elif amount.lower() in ['-', 'w', 'withdrawal']:
+                    predicates.append((0, lambda t: t.amount < 0))
+            elif isinstance(amount, tuple):
+                amount_lower, amount_upper = amount[0], amount[1]
+                predicates.append((0, lambda t: amount_lower <= t.amount <= amount_upper))
+            else:
+                predicates.append((3, lambda t: amount(t.amount)))
+        if 'date' in kwargs:
+            date = kwargs['date']
+            if isinstance(date, int):
+                most_recent_date = max(t.date for t in self.items)
+                cutoff_ordinal = min(max(most_recent_date.toordinal() - date, 1), datetime.date.max.toordinal())
+                cutoff_date = datetime.date.fromordinal(cutoff_ordinal)
+                predicates.append((0, lambda t: t.date >= cutoff_date))
+            elif isinstance(date, str):
+                lowerbound, upperbound = Transactions._date_bounds(date)
+                predicates.append((0, lambda t: lowerbound <= t.date <= upperbound))
+            elif isinstance(date, tuple):
+                lowerbound = Transactions._date_bounds(date[0])[0]
+                upperbound = Transactions._date_bounds(date[1])[1]
+                predicates.append((0, lambda t: lowerbound <= t.date <= upperbound))
+            elif isinstance(date, datetime.date):
+                predicates.append((0, lambda t: t.date == date))
+            else:
+                predicates.append((3, lambda t: date(t.date)))
+        predicates = [p for cost, p in sorted(predicates, key=lambda cp: cp[0])]
+        if negate:
+            filtered = [copy.deepcopy(t) for t in self if not any(p(t) for p in predicates)]
+        else:
+            filtered = [copy.deepcopy(t) for t in self if all(p(t) for p in predicates)]
         return Transactions(items = filtered)
 
     @staticmethod
@@ -422,11 +492,7 @@ class Transactions:
         '''
         Creates a new list of transactions given a JSON string representation.
         '''
-        ts = []
-        data = json.loads(jsonstr)
-        for tjson in data:
-            ts.append(Transaction.from_datestr_dict(tjson))
-        return Transactions(ts)
+        return Transactions([Transaction.from_datestr_dict(t) for t in json.loads(jsonstr)])
 
     def group(self, by: str = 'date-monthly', drange: int = 100.0, include_empty: bool = False, interval: int = 1) -> dict[Any, Transactions]:
         '''
@@ -436,6 +502,7 @@ class Transactions:
             * bank
             * desc
             * name
+            * tag
           * key = tuple[date, date]
             * date-daily
             * date-monthly
@@ -457,7 +524,8 @@ class Transactions:
         argument allows one to specify the dollar range between bins when
         grouping by `amount` or `balance`. In the case of grouping by tags or
         names, all uncategorized transactions will be under the `None` key if
-        `include_empty` is set to `True`.
+        `include_empty` is set to `True`. When grouping by `tag`, each
+        transaction is placed in the group of every one of its tags.
         '''
         if len(self.items) < 1: return {}
         res = {}
@@ -467,60 +535,36 @@ class Transactions:
             items = self.sort(key='balance').items
         else:
             items = self.sort().items
-        if by == 'bank-account':
-            for bank in self.banks():
-                for account in self.accounts(bank):
-                    res[(bank, account)] = Transactions([t for t in items if t.bank == bank and t.account == account]).sort()
-        elif by == 'account':
-            for account in self.accounts():
-                res[account] = Transactions([t for t in items if t.account == account]).sort()
-        elif by == 'bank':
-            for bank in self.banks():
-                res[bank] = Transactions([t for t in items if t.bank == bank]).sort()
+        if by in ['account', 'bank', 'bank-account', 'desc', 'name']:
+            if by == 'bank-account':
+                keyfunc = lambda t: (t.bank, t.account)
+            else:
+                keyfunc = lambda t: t[by]
+            collections = {}
+            for i in items:
+                key = keyfunc(i)
+                if key is None: continue
+                if not key in collections:
+                    collections[key] = [i]
+                else:
+                    collections[key].append(i)
+            res = {k: Transactions(v).sort() for k, v in collections.items()}
+            if by == 'name' and include_empty:
+                res[None] = Transactions([t for t in items if not t.is_named()]).sort()
         elif by.startswith('date-'):
-            freq = {
-                'date-daily': (dateutil.rrule.DAILY, items[0].date, dateutil.relativedelta.relativedelta(days=1)),
-                'date-monthly': (dateutil.rrule.MONTHLY, items[0].date.replace(day=1), dateutil.relativedelta.relativedelta(months=1)),
-                'date-weekly': (dateutil.rrule.WEEKLY, items[0].date, dateutil.relativedelta.relativedelta(weeks=1)),
-                'date-yearly': (dateutil.rrule.YEARLY, items[0].date.replace(month=1, day=1), dateutil.relativedelta.relativedelta(years=1))
-            }
-            datesteps = list(dateutil.rrule.rrule(
-                freq[by][0],
-                dtstart  = freq[by][1],
-                interval = interval,
-                until    = items[-1].date + freq[by][2],
-                wkst     = dateutil.rrule.SU
-            ))
-            dateranges = [(datesteps[i].date(), datesteps[i+1].date()) for i in range(len(datesteps) - 1)]
-            for lower, upper in dateranges:
-                selected_items = [t for t in items if t.date >= lower and t.date < upper]
+            datesteps = Transactions._datesteps(by, items[0].date, items[-1].date, interval)
+            dateranges = [(datesteps[i], datesteps[i+1]) for i in range(len(datesteps) - 1)]
+            for (lower, upper), selected_items in zip(dateranges, Transactions._bins(items, 'date', dateranges)):
                 if not include_empty and not selected_items: continue
-                for t in selected_items: items.remove(t)
                 res[(lower, upper)] = Transactions(selected_items).sort()
-        elif by == 'amount':
-            for rl in numpy.arange(math.floor(items[0].amount), math.ceil(items[-1].amount) + drange + 2.0, float(drange)):
+        elif by in ['amount', 'balance']:
+            ranges = []
+            for rl in numpy.arange(math.floor(items[0][by]), math.ceil(items[-1][by]) + drange + 2.0, float(drange)):
                 lower = round(rl, 2)
-                upper = round(lower + drange, 2)
-                selected_items = [t for t in items if t.amount >= lower and t.amount < upper]
+                ranges.append((lower, round(lower + drange, 2)))
+            for (lower, upper), selected_items in zip(ranges, Transactions._bins(items, by, ranges)):
                 if not include_empty and not selected_items: continue
-                for t in selected_items: items.remove(t)
                 res[(lower, upper)] = Transactions(selected_items).sort()
-        elif by == 'balance':
-            for rl in numpy.arange(math.floor(items[0].balance), math.ceil(items[-1].balance) + drange + 2.0, float(drange)):
-                lower = round(rl, 2)
-                upper = round(lower + drange, 2)
-                selected_items = [t for t in items if t.balance >= lower and t.balance < upper]
-                if not include_empty and not selected_items: continue
-                for t in selected_items: items.remove(t)
-                res[(lower, upper)] = Transactions(selected_items).sort()
-        elif by == 'desc':
-            for desc in self.descs():
-                res[desc] = Transactions([t for t in items if t.desc == desc]).sort()
-        elif by == 'name':
-            for name in self.names():
-                res[name] = Transactions([t for t in items if t.name == name]).sort()
-            if include_empty:
-                res[None] = Transactions([t for t in items if not t.is_named()]).sort()
         elif by == 'tags':
             collections = {}
             for i in items:
@@ -535,6 +579,21 @@ class Transactions:
                 else:
                     collections[tags].append(i)
             res = {k: Transactions(v).sort() for k, v in collections.items()}
+        elif by == 'tag':
+            collections = {}
+            for i in items:
+                if i.tags:
+                    tags = set(i.tags)
+                elif include_empty:
+                    tags = [None]
+                else:
+                    continue
+                for tag in tags:
+                    if not tag in collections:
+                        collections[tag] = [i]
+                    else:
+                        collections[tag].append(i)
+            res = {k: Transactions(v).sort() for k, v in collections.items()}
         return res
 
     def hovertext(self, pkey: str = 'name', skey: Optional[str] = 'amount') -> str:
@@ -573,7 +632,7 @@ class Transactions:
         Loads a list of transactions from the specified file path.
         '''
         with open(os.path.expanduser(file_path), 'r') as f:
-            return Transactions.from_json(f.read())
+            return Transactions([Transaction.from_datestr_dict(t) for t in json.load(f)])
 
     def max_amount(self, absolute_value: bool = False) -> Optional[float]:
         '''
@@ -582,10 +641,7 @@ class Transactions:
         ignored.
         '''
         if len(self.items) < 1: return None
-        if absolute_value:
-            return max([abs(t.amount) for t in self])
-        else:
-            return max([t.amount for t in self])
+        return float(self._values('amount', absolute_value).max())
 
     def max_balance(self, absolute_value: bool = False) -> Optional[float]:
         '''
@@ -594,10 +650,7 @@ class Transactions:
         ignored.
         '''
         if len(self.items) < 1: return None
-        if absolute_value:
-            return max([abs(t.balance) for t in self])
-        else:
-            return max([t.balance for t in self])
+        return float(self._values('balance', absolute_value).max())
 
     def mean_amount(self, absolute_value: bool = False) -> Optional[float]:
         '''
@@ -606,10 +659,7 @@ class Transactions:
         ignored.
         '''
         if len(self.items) < 1: return None
-        if absolute_value:
-            return round(statistics.mean([abs(t.amount) for t in self]), 2)
-        else:
-            return round(statistics.mean([t.amount for t in self]), 2)
+        return round(float(self._values('amount', absolute_value).mean()), 2)
 
     def mean_balance(self, absolute_value: bool = False) -> Optional[float]:
         '''
@@ -618,10 +668,7 @@ class Transactions:
         ignored.
         '''
         if len(self.items) < 1: return None
-        if absolute_value:
-            return round(statistics.mean([abs(t.balance) for t in self]), 2)
-        else:
-            return round(statistics.mean([t.balance for t in self]), 2)
+        return round(float(self._values('balance', absolute_value).mean()), 2)
 
     def mean_freq(self, scale: str = 'daily') -> Optional[float]:
         '''
@@ -629,10 +676,7 @@ class Transactions:
         scale, being `daily`, `weekly`, `monthly`, or `yearly`.
         '''
         if len(self.items) < 1: return None
-        if not scale in ['daily', 'weekly', 'monthly', 'yearly']:
-            raise Exception('please specify an appropriate time scale')
-        grouped = self.group(by=f'date-{scale}', include_empty=True)
-        return round(statistics.mean([len(ts) for d, ts in grouped.items()]), 4)
+        return round(statistics.mean(self._freq_counts(scale)), 4)
 
     def median_freq(self, scale: str = 'daily') -> Optional[float]:
         '''
@@ -640,10 +684,7 @@ class Transactions:
         scale, being `daily`, `weekly`, `monthly`, or `yearly`.
         '''
         if len(self.items) < 1: return None
-        if not scale in ['daily', 'weekly', 'monthly', 'yearly']:
-            raise Exception('please specify an appropriate time scale')
-        grouped = self.group(by=f'date-{scale}', include_empty=True)
-        return round(statistics.median([len(ts) for d, ts in grouped.items()]), 4)
+        return round(statistics.median(self._freq_counts(scale)), 4)
 
     def median_amount(self, absolute_value: bool = False) -> Optional[float]:
         '''
@@ -652,10 +693,7 @@ class Transactions:
         ignored.
         '''
         if len(self.items) < 1: return None
-        if absolute_value:
-            return round(statistics.median([abs(t.amount) for t in self]), 2)
-        else:
-            return round(statistics.median([t.amount for t in self]), 2)
+        return round(float(numpy.median(self._values('amount', absolute_value))), 2)
 
     def median_balance(self, absolute_value: bool = False) -> Optional[float]:
         '''
@@ -664,10 +702,7 @@ class Transactions:
         ignored.
         '''
         if len(self.items) < 1: return None
-        if absolute_value:
-            return round(statistics.median([abs(t.balance) for t in self]), 2)
-        else:
-            return round(statistics.median([t.balance for t in self]), 2)
+        return round(float(numpy.median(self._values('balance', absolute_value))), 2)
 
     @staticmethod
     def merge(*args) -> Transactions:
@@ -677,21 +712,24 @@ class Transactions:
         delete duplicate entries, but the last arguments have preference.
         '''
         merged = []
+        positions = {}
         for tlist in args:
             for t in tlist:
-                ct = copy.deepcopy(t)
-                if not ct in merged:
-                    merged.append(ct)
+                if not t in positions:
+                    positions[t] = len(merged)
+                    merged.append(t)
                 else:
-                    di = merged.index(ct)
-                    dc = copy.deepcopy(merged[di])
-                    if ct.is_named() or not dc.is_named():
-                        dc.name = ct.name
-                    if ct.has_note() or not dc.has_note():
-                        dc.note = ct.note
-                    if ct.is_categorized() or not dc.is_categorized():
-                        dc.tags = ct.tags
+                    di = positions[t]
+                    dc = copy.copy(merged[di])
+                    if t.is_named() or not dc.is_named():
+                        dc.name = t.name
+                    if t.has_note() or not dc.has_note():
+                        dc.note = t.note
+                    if t.is_categorized() or not dc.is_categorized():
+                        dc.tags = t.tags
                     merged[di] = dc
+        # Sorting copies each transaction, so nothing in the result is shared
+        # with the input collections.
         return Transactions(merged).sort()
 
     def min_amount(self, absolute_value: bool = False) -> Optional[float]:
@@ -701,10 +739,7 @@ class Transactions:
         ignored.
         '''
         if len(self.items) < 1: return None
-        if absolute_value:
-            return min([abs(t.amount) for t in self])
-        else:
-            return min([t.amount for t in self])
+        return float(self._values('amount', absolute_value).min())
 
     def min_balance(self, absolute_value: bool = False) -> Optional[float]:
         '''
@@ -713,10 +748,7 @@ class Transactions:
         ignored.
         '''
         if len(self.items) < 1: return None
-        if absolute_value:
-            return min([abs(t.balance) for t in self])
-        else:
-            return min([t.balance for t in self])
+        return float(self._values('balance', absolute_value).min())
 
     def names(self) -> list[str]:
         '''
@@ -761,45 +793,34 @@ class Transactions:
         * stdev_freq_[daily, monthly, weekly, yearly]
         * total_[abs_amount, abs_balance, amount, balance]
         '''
-        return {
-            'count': len(self.items),
-            'max_abs_amount': self.max_amount(absolute_value=True),
-            'max_abs_balance': self.max_balance(absolute_value=True),
-            'max_amount': self.max_amount(),
-            'max_balance': self.max_balance(),
-            'mean_abs_amount': self.mean_amount(absolute_value=True),
-            'mean_abs_balance': self.mean_balance(absolute_value=True),
-            'mean_amount': self.mean_amount(),
-            'mean_balance': self.mean_balance(),
-            'mean_freq_daily': self.mean_freq(scale='daily'),
-            'mean_freq_monthly': self.mean_freq(scale='monthly'),
-            'mean_freq_weekly': self.mean_freq(scale='weekly'),
-            'mean_freq_yearly': self.mean_freq(scale='yearly'),
-            'median_abs_amount': self.median_amount(absolute_value=True),
-            'median_abs_balance': self.median_balance(absolute_value=True),
-            'median_amount': self.median_amount(),
-            'median_balance': self.median_balance(),
-            'median_freq_daily': self.median_freq(scale='daily'),
-            'median_freq_monthly': self.median_freq(scale='monthly'),
-            'median_freq_weekly': self.median_freq(scale='weekly'),
-            'median_freq_yearly': self.median_freq(scale='yearly'),
-            'min_abs_amount': self.min_amount(absolute_value=True),
-            'min_abs_balance': self.min_balance(absolute_value=True),
-            'min_amount': self.min_amount(),
-            'min_balance': self.min_balance(),
-            'stdev_abs_amount': self.stdev_amount(absolute_value=True),
-            'stdev_abs_balance': self.stdev_balance(absolute_value=True),
-            'stdev_amount': self.stdev_amount(),
-            'stdev_balance': self.stdev_balance(),
-            'stdev_freq_daily': self.stdev_freq(scale='daily'),
-            'stdev_freq_monthly': self.stdev_freq(scale='monthly'),
-            'stdev_freq_weekly': self.stdev_freq(scale='weekly'),
-            'stdev_freq_yearly': self.stdev_freq(scale='yearly'),
-            'total_abs_amount': self.total_amount(absolute_value=True),
-            'total_abs_balance': self.total_balance(absolute_value=True),
-            'total_amount': self.total_amount(),
-            'total_balance': self.total_balance()
-        }
+        # Each field is gathered (and each time scale grouped) only once, with
+        # every statistic then computed exactly as its dedicated method would.
+        res = {'count': len(self.items)}
+        for key in ['amount', 'balance']:
+            values = self._values(key)
+            for field, vs in [(f'abs_{key}', numpy.abs(values)), (key, values)]:
+                if len(vs) < 1:
+                    for stat in ['max', 'mean', 'median', 'min', 'stdev']:
+                        res[f'{stat}_{field}'] = None
+                    res[f'total_{field}'] = 0.0
+                    continue
+                res[f'max_{field}'] = float(vs.max())
+                res[f'mean_{field}'] = round(float(vs.mean()), 2)
+                res[f'median_{field}'] = round(float(numpy.median(vs)), 2)
+                res[f'min_{field}'] = float(vs.min())
+                res[f'stdev_{field}'] = round(float(vs.std(ddof=1)), 2) if len(vs) > 1 else 0.0
+                res[f'total_{field}'] = round(float(vs.sum()), 2)
+        for scale in ['daily', 'monthly', 'weekly', 'yearly']:
+            counts = self._freq_counts(scale)
+            if len(counts) < 1:
+                res[f'mean_freq_{scale}'] = None
+                res[f'median_freq_{scale}'] = None
+                res[f'stdev_freq_{scale}'] = None
+                continue
+            res[f'mean_freq_{scale}'] = round(statistics.mean(counts), 4)
+            res[f'median_freq_{scale}'] = round(statistics.median(counts), 4)
+            res[f'stdev_freq_{scale}'] = round(statistics.stdev(counts), 4) if len(counts) > 1 else 0.0
+        return dict(sorted(res.items()))
 
     def stdev_amount(self, absolute_value: bool = False) -> Optional[float]:
         '''
@@ -811,10 +832,7 @@ class Transactions:
             return None
         elif len(self.items) == 1:
             return 0.0
-        if absolute_value:
-            return round(statistics.stdev([abs(t.amount) for t in self]), 2)
-        else:
-            return round(statistics.stdev([t.amount for t in self]), 2)
+        return round(float(self._values('amount', absolute_value).std(ddof=1)), 2)
 
     def stdev_balance(self, absolute_value: bool = False) -> Optional[float]:
         '''
@@ -826,42 +844,31 @@ class Transactions:
             return None
         elif len(self.items) == 1:
             return 0.0
-        if absolute_value:
-            return round(statistics.stdev([abs(t.balance) for t in self]), 2)
-        else:
-            return round(statistics.stdev([t.balance for t in self]), 2)
+        return round(float(self._values('balance', absolute_value).std(ddof=1)), 2)
 
     def stdev_freq(self, scale: str = 'daily') -> Optional[float]:
         '''
         Returns the standard deviation of frequency (number of transactions) on
         a given time scale, being `daily`, `weekly`, `monthly`, or `yearly`.
         '''
-        if not scale in ['daily', 'weekly', 'monthly', 'yearly']:
-            raise Exception('please specify an appropriate time scale')
-        grouped = self.group(by=f'date-{scale}', include_empty=True)
-        if len(grouped) < 1:
+        counts = self._freq_counts(scale)
+        if len(counts) < 1:
             return None
-        elif len(grouped) == 1:
+        elif len(counts) == 1:
             return 0.0
-        return round(statistics.stdev([len(ts) for d, ts in grouped.items()]), 4)
+        return round(statistics.stdev(counts), 4)
 
     def tags(self) -> list[str]:
         '''
         Returns the list of all tags present in this list of transactions.
         '''
-        tgs = []
-        for t in self:
-            tgs.extend(t.tags)
-        return sorted(list(set(tgs)))
+        return sorted({tag for t in self.items for tag in t.tags})
 
     def to_json(self) -> str:
         '''
         Converts the list of transactions into a JSON object.
         '''
-        ts = []
-        for t in self:
-            ts.append(t.to_datestr_dict())
-        return json.dumps(ts)
+        return json.dumps([t.to_datestr_dict() for t in self.items])
 
     def total_amount(self, absolute_value: bool = False) -> float:
         '''
@@ -871,10 +878,7 @@ class Transactions:
         '''
         if len(self.items) < 1:
             return 0.0
-        if absolute_value:
-            return round(sum([abs(t.amount) for t in self]), 2)
-        else:
-            return round(sum([t.amount for t in self]), 2)
+        return round(float(self._values('amount', absolute_value).sum()), 2)
 
     def total_balance(self, absolute_value: bool = False) -> float:
         '''
@@ -884,10 +888,7 @@ class Transactions:
         '''
         if len(self.items) < 1:
             return 0.0
-        if absolute_value:
-            return round(sum([abs(t.balance) for t in self]), 2)
-        else:
-            return round(sum([t.balance for t in self]), 2)
+        return round(float(self._values('balance', absolute_value).sum()), 2)
 
     def uncategorized(self) -> Transactions:
         '''
@@ -2,7 +2,14 @@
 Tests categorizer objects and associated definitions.
 '''
 
+import copy
+import json
+import os
+import pickle
+import yaml
+
 from tcat import Categorizer, Transaction, Transactions
+from tcat.categorizer import _required_literal
 
 from . import (
     DATA_CONTENT,
@@ -43,3 +50,60 @@ def test_categorizer_data():
     assert T4U_cat.is_named()
     TU_cat  = c.cat(TU)
     assert [t.is_categorized() for t in TU_cat] == [True, False, True, True]
+    TU_tagged = c.cat(TU, tags=['imported'])
+    assert ['imported' in t.tags for t in TU_tagged] == [True, False, True, True]
+    unpickled = pickle.loads(pickle.dumps(c))
+    assert unpickled.cat(T1U).name == 'Pizza Planet'
+    assert unpickled.cat(T4U).name == 'Sub Shop'
+
+def test_categorizer_data_path(tmp_path):
+    '''
+    Tests the categorizer using the `data_path` argument, which should not
+    read any data files until the categorizer is used.
+    '''
+    for i, pdata in enumerate(DATA_CONTENT):
+        with open(tmp_path / f'data{i}.yaml', 'w') as f:
+            f.write(yaml.safe_dump(pdata))
+    c = Categorizer(data_path=str(tmp_path))
+    assert len(c.data_files) == 2
+    assert not 'raw_data' in c.__dict__
+    T1U_cat = c.cat(T1U)
+    assert T1U_cat.name == 'Pizza Planet'
+    assert set(T1U_cat.tags) == set(['food', 'pizza'])
+    assert len(c.raw_data) == 2
+    assert (tmp_path / 'data0.yaml.cache.json').is_file()
+    cached = Categorizer(data_path=str(tmp_path))
+    assert len(cached.data_files) == 2
+    assert sorted(map(str, cached.raw_data)) == sorted(map(str, c.raw_data))
+    # The cache should be read in place of the data file while its key matches.
+    cache_path = tmp_path / 'data0.yaml.cache.json'
+    cache = json.loads(cache_path.read_text())
+    cache['data']['data'][0]['name'] = 'Cached Planet'
+    cache_path.write_text(json.dumps(cache))
+    assert Categorizer(data_path=str(tmp_path)).cat(T1U).name == 'Cached Planet'
+    # ... and should be ignored once the data file changes, even if its
+    # modification time is preserved.
+    data_path = tmp_path / 'data0.yaml'
+    stat = os.stat(data_path)
+    pdata = copy.deepcopy(DATA_CONTENT[0])
+    pdata['data'][0]['name'] = 'Pizza Planet Renamed'
+    data_path.write_text(yaml.safe_dump(pdata))
+    os.utime(data_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert Categorizer(data_path=str(tmp_path)).cat(T1U).name == 'Pizza Planet Renamed'
+    assert json.loads(cache_path.read_text())['data'] == pdata
+    assert not list(tmp_path.glob('*.tmp'))
+
+def test_required_literal():
+    '''
+    Tests the literal prefilter derived from categorizer match patterns,
+    particularly that multi-character escapes are never taken as literal text.
+    '''
+    assert _required_literal(r'pizza\s*planet')    == 'planet'
+    assert _required_literal(r'at\x26t bill')      == 't bill'
+    assert _required_literal(r'\u0062ill')         == 'ill'
+    assert _required_literal(r'at\046t')           == 'at'
+    assert _required_literal(r'\N{AMPERSAND}bill') == 'bill'
+    assert _required_literal(r'(a)\1xyz')          == 'xyz'
+    c = Categorizer(data_content=[{'data': [{'name': 'AT&T', 'match': r'at\x26t'}]}])
+    att = Transaction(account='checking', amount=-1.0, balance=1.0, bank='bank1', date=T1U.date, desc='AT&T 123')
+    assert c.cat(att).name == 'AT&T'
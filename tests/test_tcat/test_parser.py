@@ -3,6 +3,7 @@ Tests transaction parser objects and associated definitions.
 '''
 
 import datetime
+import pytest
 
 from tcat import Parser, Transaction, Transactions
 
@@ -17,6 +18,12 @@ def test_amount_string_conversions():
     assert Parser.amount_from_str('$1.23')    == 1.23
     assert Parser.amount_from_str('$-99')     == -99.0
     assert Parser.amount_from_str('($67.55)') == -67.55
+    assert Parser.amount_from_str('$1,234.5') == 1234.5
+    assert Parser.amount_from_str('-$12,345') == -12345.0
+    assert Parser.amount_from_str('($1,000)') == -1000.0
+    for invalid in ['1,5', '$1.234,56', '($1,50)', '1,2345.00', ',123']:
+        with pytest.raises(Exception):
+            Parser.amount_from_str(invalid)
     assert Parser.amount_to_str(5.89)         == '$5.89'
     assert Parser.amount_to_str(-986.344)     == '-$986.34'
 
@@ -27,6 +34,22 @@ def test_clean_desc():
     assert Parser.clean_desc('100%%')                == '100%'
     assert Parser.clean_desc('D&amp;D')              == 'D&D'
     assert Parser.clean_desc('Bill &amp; Ted&#39;s') == "Bill & Ted's"
+    assert Parser.clean_desc('&quot;AT&amp;T&quot;')  == '"AT&T"'
+    assert Parser.clean_desc('SMITH&COPY CENTER')    == 'SMITH&COPY CENTER'
+    assert Parser.clean_desc('A&GT')                 == 'A&GT'
+    assert Parser.clean_desc('A&REG B &ampx;')       == 'A&REG B &ampx;'
+    assert Parser.clean_desc('&#x41;&#66;&copy;')    == 'AB©'
+
+def test_date_from_str():
+    '''
+    Tests the `Parser.date_from_str()` function.
+    '''
+    assert Parser.date_from_str('04/13/2020') == datetime.date(2020, 4, 13)
+    assert Parser.date_from_str('4/3/2020')   == datetime.date(2020, 4, 3)
+    assert Parser.date_from_str('2020/04/13') == datetime.date(2020, 4, 13)
+    assert Parser.date_from_str('2020-04-13') == datetime.date(2020, 4, 13)
+    assert Parser.date_from_str('13/04/2020') == datetime.date(2020, 4, 13)
+    assert Parser.date_from_str('Apr 13 2020') == datetime.date(2020, 4, 13)
 
 def test_parse_credit_csv_content():
     '''
@@ -129,3 +152,9 @@ def test_parse_transaction_csv_content():
         date    = datetime.date(2021, 6, 1),
         desc    = 'SUB SHOP 0123456789 1'
     )
+    lines = Parser().parse_transaction_csv_content(
+        account = 'checking',
+        bank = 'bank1',
+        content = CSV_CONTENT.splitlines()
+    )
+    assert lines == transactions
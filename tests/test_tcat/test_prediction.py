@@ -2,6 +2,7 @@
 Tests constructs defined within "prediction.py".
 '''
 import datetime
+import numpy
 import pytest
 
 from tcat import Simulator, Transaction, Transactions
@@ -63,10 +64,62 @@ T8 = Transaction(
 )
 T = Transactions([T1, T2, T3, T4, T5, T6, T7, T8])
 
+# A month of daily activity, with a varying number of deposits and withdrawals
+# each day, for which the simulator should produce plenty of transactions.
+DENSE = Transactions([
+    Transaction(
+        account='checking',
+        amount=(12.5 * (i + 1)) if i % 2 else -(3.25 * (i + 1)),
+        balance=100.0,
+        bank='bank1',
+        date=D5 + datetime.timedelta(days=day),
+        desc=f'DENSE TRANSACTION {day}-{i}'
+    )
+    for day in range(30) for i in range((day * 7) % 5 + 1)
+])
+
+def _assert_running_balances(sim: Simulator, ts: Transactions, account_suffix: str):
+    '''
+    Asserts that, within each simulated account, every balance is the previous
+    balance plus the transaction amount, starting from the zero balance.
+    '''
+    for (bank, account), ats in ts.group(by='bank-account').items():
+        balance = sim.data[bank][account[:-len(account_suffix)]]['zero_balance']
+        for t in ats:
+            balance += t.amount
+            assert t.balance == pytest.approx(balance)
+
 def test_simulator():
     '''
     Tests the basic creation and execution of `Simulator` objects.
     '''
-    sim = Simulator(T.filter(bank='bank1', account='checking'))
+    numpy.random.seed(0)
+    sim = Simulator(T.filter(bank='bank1', account='checking') + DENSE)
     res = sim.run(30)
+    assert len(res) > 30
+    assert all(t.tags == ['simulated'] for t in res)
+    zero_date = sim.data['bank1']['checking']['zero_date']
+    assert min(t.date for t in res) == zero_date + datetime.timedelta(days=1)
+    assert max(t.date for t in res) == zero_date + datetime.timedelta(days=30)
+    _assert_running_balances(sim, res, ' - Prediction')
     multi = sim.multi_run(5, 30)
+    assert len(multi.group(by='account')) == 5
+    for i in range(5):
+        _assert_running_balances(sim, multi.filter(account=f'checking - Prediction {i + 1}'), f' - Prediction {i + 1}')
+
+def test_simulator_limits():
+    '''
+    Tests that simulated transactions respect `max_per_day` and have amounts of
+    the expected sign.
+    '''
+    numpy.random.seed(1)
+    sim = Simulator(DENSE)
+    assert len(sim.run(30, max_per_day=0)) == 0
+    res = sim.run(60, max_per_day=2)
+    deposits = res.filter(name='Simulated Deposit')
+    withdrawals = res.filter(name='Simulated Withdrawal')
+    assert len(deposits) > 0 and len(withdrawals) > 0
+    assert all(t.amount >= 0 for t in deposits)
+    assert all(t.amount <= 0 for t in withdrawals)
+    for ts in (deposits, withdrawals):
+        assert max(len(g) for g in ts.group(by='date-daily').values()) <= 2
@@ -173,9 +173,14 @@ def test_transactions_filtering():
     # date
     assert set(T.filter(date='2020'))                      == set([T1, T2, T3])
     assert set(T.filter(date='2020/04'))                   == set([T1, T2])
+    assert set(T.filter(date='2020/04', negate=True))         == set([T3, T4])
     assert set(T.filter(date='2020/04/13'))                == set([T1])
     assert set(T.filter(date=D1))                          == set([T1])
+    assert set(T.filter(date=365))                         == set([T4])
+    assert set(T.filter(date=365, negate=True))               == set([T1, T2, T3])
     assert set(T.filter(date=('2020/03', '2020/04')))      == set([T1, T2, T3])
+    leap = Transaction(account='checking', amount=-1.0, balance=1.0, bank='bank1', date=datetime.date(2020, 2, 29), desc='LEAP')
+    assert set(Transactions([leap, T3]).filter(date=('2020/01', '2020/02'))) == set([leap])
     # combination
     assert set(T.filter(account='checking', date='2020'))  == set([T1, T3])
 
@@ -194,6 +199,7 @@ def test_transactions_grouping():
     date_yearly  = T.group(by='date-yearly')
     descs        = T.group(by='desc')
     names        = T.group(by='name')
+    tag          = T.group(by='tag')
     tags         = T.group(by='tags')
     assert account == {
         'checking': Transactions([T3, T1, T4]),
@@ -230,6 +236,13 @@ def test_transactions_grouping():
         'Pizza Planet': Transactions([T3, T1]),
         'Sub Shop': Transactions([T4])
     }
+    assert tag == {
+        'food': Transactions([T3, T1, T4]),
+        'pizza': Transactions([T3, T1]),
+        'subs': Transactions([T4])
+    }
+    tag['pizza'][0].tags.append('modified')
+    assert not 'modified' in tag['food'][0].tags
     assert tags == {
         ('food', 'pizza'): Transactions([T3, T1]), # already sorted.
         ('food', 'subs'): Transactions([T4])
@@ -264,7 +277,7 @@ def test_transactions_json_conversion():
 
 def test_transactions_merging():
     '''
-    Tests the `merge()` method.
+    Tests the `merge()` method and concatenation.
     '''
     t1 = Transactions([T1, T2])
     t2 = Transactions([T3, T4])
@@ -272,6 +285,7 @@ def test_transactions_merging():
     assert set(Transactions.merge(t1, t2))     == set([T1, T2, T3, T4])
     assert set(Transactions.merge(t1, t2, t3)) == set([T1, T2, T3, T4])
     assert set(Transactions.merge(t1, t3))     == set([T1, T2, T4])
+    assert t1 + t3 == Transactions([T1, T2, T1, T4])
 
 def test_transactions_statistics():
     '''